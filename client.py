@@ -0,0 +1,77 @@
+import http.client
+import json
+import time
+import urllib.error
+import urllib.request
+
+DEFAULT_SERVER = "http://127.0.0.1:8765"
+
+
+class CompileServerError(Exception):
+    pass
+
+
+class CompileServerBusy(CompileServerError):
+    pass
+
+
+# Thin client for server.py. Methods mirror the JSON entry points in compiler_core,
+# so the GUI can use either one as its backend.
+class CompileClient:
+    def __init__(self, base_url=DEFAULT_SERVER, timeout=3, busy_retries=2, max_retry_wait=1.0):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.busy_retries = busy_retries
+        self.max_retry_wait = max_retry_wait
+
+    def _post(self, endpoint, payload):
+        data = json.dumps(payload).encode("utf-8")
+        for attempt in range(self.busy_retries + 1):
+            request = urllib.request.Request(
+                f"{self.base_url}/{endpoint}",
+                data=data,
+                headers={"Content-Type": "application/json"},
+            )
+            try:
+                with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                    body = json.loads(response.read())
+                return body["result"]
+            except urllib.error.HTTPError as e:
+                try:
+                    message = json.loads(e.read()).get("error", e.reason)
+                except (ValueError, AttributeError, OSError, http.client.HTTPException):
+                    message = e.reason
+                if e.code != 503:
+                    raise CompileServerError(message) from None
+                # Server is shedding load: honour Retry-After (capped) before giving up
+                if attempt < self.busy_retries:
+                    time.sleep(self._retry_wait(e.headers.get("Retry-After")))
+            except urllib.error.URLError as e:
+                raise CompileServerError(f"Compile server unreachable at {self.base_url}: {e.reason}") from None
+            except (OSError, http.client.HTTPException) as e:
+                # Timeouts and connections dropped mid-response
+                raise CompileServerError(f"Lost connection to compile server at {self.base_url}: {e!r}") from None
+            except (ValueError, KeyError, TypeError):
+                raise CompileServerError(f"Compile server at {self.base_url} sent an invalid response") from None
+        raise CompileServerBusy(f"Compile server is busy, please try again in a moment ({message})")
+
+    def _retry_wait(self, retry_after):
+        try:
+            return min(float(retry_after), self.max_retry_wait)
+        except (TypeError, ValueError):
+            return self.max_retry_wait
+
+    def tokenize(self, code):
+        return self._post("tokenize", {"code": code})
+
+    def parse(self, code):
+        return self._post("parse", {"code": code})
+
+    def annotate(self, code):
+        return self._post("annotate", {"code": code})
+
+    def three_address_code(self, code):
+        return self._post("tac", {"code": code})
+
+    def map_speech(self, text, language="Python", user_code=""):
+        return self._post("map", {"text": text, "language": language, "user_code": user_code})
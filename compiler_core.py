@@ -0,0 +1,436 @@
+import re
+from functools import lru_cache
+from lark import Lark, Tree, Token
+
+
+# Define a simple grammar for parse tree generation
+# Built lazily so GUI thin clients never pay for it, and once per process otherwise.
+@lru_cache(maxsize=None)
+def get_parser():
+    return Lark(r"""
+    start: statement+
+
+    statement: assignment
+             | expr
+
+    assignment: NAME "=" expr
+
+    ?expr: expr "+" term   -> add
+         | expr "-" term   -> sub
+         | term
+
+    ?term: term "*" factor -> mul
+         | term "/" factor -> div
+         | term "%" factor -> mod
+         | factor
+
+    ?factor: "-" factor    -> neg
+           | "+" factor    -> pos
+           | NUMBER        -> number
+           | NAME          -> var
+           | "(" expr ")"
+
+    %import common.CNAME -> NAME
+    %import common.NUMBER
+    %import common.NEWLINE
+    %import common.WS
+    %ignore WS
+    %ignore NEWLINE
+""", parser='lalr')
+
+
+def tokenize_code(code):
+    keywords = {
+        'if', 'else', 'elif', 'for', 'while', 'def', 'return', 'in',
+        'and', 'or', 'not', 'True', 'False', 'None', 'class', 'break',
+        'continue', 'pass', 'import', 'from', 'as', 'with', 'is', 'lambda'
+    }
+#Tokenization Function
+    token_specification = [
+        ('COMMENT',  r'#.*'),                            # Comments
+        ('STRING',   r'(\".*?\"|\'.*?\')'),              # Strings
+        ('NUMBER',   r'\d+(\.\d*)?'),                    # Integer or decimal numbers
+        ('ASSIGN',   r'='),                              # Assignment
+        ('OP',       r'[+\-*/%]'),                       # Operators
+        ('LIST',     r'[\[\]]'),                         # List brackets
+        ('DICT',     r'[\{\}]'),                         # Dictionary braces
+        ('COLON',    r':'),                              # Colon
+        ('COMMA',    r','),                              # Comma
+        ('PAREN',    r'[()]'),                           # Parentheses
+        ('ID',       r'[A-Za-z_]\w*'),                   # Identifiers or keywords
+        ('NEWLINE',  r'\n'),                             # Line breaks
+        ('SKIP',     r'[ \t]+'),                         # Whitespace
+        ('MISMATCH', r'.'),                              # Any other character
+    ]
+
+    tok_regex = '|'.join(f'(?P<{name}>{pattern})' for name, pattern in token_specification)
+    get_token = re.compile(tok_regex).match
+
+    tokens = []
+    pos = 0
+    mo = get_token(code, pos)
+    while mo is not None:
+        kind = mo.lastgroup
+        value = mo.group()
+
+        if kind in ['SKIP', 'NEWLINE', 'COMMENT']:
+            pass  # skip whitespace, newlines, comments
+        elif kind == 'ID':
+            if value in keywords:
+                kind = 'KEYWORD' if value not in {'True', 'False', 'None'} else \
+                       'BOOL' if value in {'True', 'False'} else 'NONE'
+            tokens.append((kind, value))
+        elif kind == 'MISMATCH':
+            tokens.append(('ERROR', value))
+        else:
+            tokens.append((kind, value))
+
+        pos = mo.end()
+        mo = get_token(code, pos)
+
+    return tokens
+
+# Strip comments and blank lines before parsing
+def remove_comments_and_blank_lines(code):
+    return '\n'.join(
+        line.split('#')[0].strip()
+        for line in code.splitlines()
+        if line.strip() and not line.strip().startswith('#')
+    )
+
+
+# Annotate Tree (Semantic Phase)
+def annotate_tree(node, symbol_table=None):
+    if symbol_table is None:
+        symbol_table = {}
+
+    annotations = {}
+
+    if isinstance(node, Tree):
+        if node.data == "assignment":
+            var_name = node.children[0].value
+            value_node = node.children[1]
+            value, _ = annotate_tree(value_node, symbol_table)
+            symbol_table[var_name] = value
+            annotations = {"value": f"{var_name} = {value}"}
+            return None, annotations
+
+        elif node.data in ["add", "sub", "mul", "div", "mod"]:
+            left_val, _ = annotate_tree(node.children[0], symbol_table)
+            right_val, _ = annotate_tree(node.children[1], symbol_table)
+            try:
+                result = eval(f"{left_val} {'+' if node.data=='add' else '-' if node.data=='sub' else '*' if node.data=='mul' else '/' if node.data=='div' else '%'} {right_val}")
+                return result, {"value": result}
+            except:
+                return None, {"value": "?"}
+
+        elif node.data == "number":
+            return float(node.children[0]), {"value": float(node.children[0])}
+
+        elif node.data == "var":
+            var_name = node.children[0].value
+            val = symbol_table.get(var_name, "?")
+            return val, {"value": val}
+
+        else:
+            for child in node.children:
+                annotate_tree(child, symbol_table)
+
+    return None, annotations
+
+
+
+#3. Three Address Code Generation
+temp_counter = 0  # Ensure this is at the top-level of your file (outside any function)
+
+def generate_three_address_code(node, tac=None, symbol_table=None):
+    global temp_counter
+
+    if tac is None:
+        tac = []
+    if symbol_table is None:
+        symbol_table = {}
+
+    def new_temp():
+        global temp_counter  
+        temp = f"t{temp_counter}"
+        temp_counter += 1
+        return temp
+
+    def process(node):
+        if isinstance(node, Tree):
+            if node.data == "assignment":
+                var_name = node.children[0].value
+                expr = node.children[1]
+                result = process(expr)
+                tac.append(f"{var_name} = {result}")
+                symbol_table[var_name] = result
+                return var_name
+
+            elif node.data in ["add", "sub", "mul", "div", "mod"]:
+                a = process(node.children[0])
+                b = process(node.children[1])
+                temp = new_temp()
+                op = {
+                    "add": "+", "sub": "-", "mul": "*", "div": "/", "mod": "%"
+                }[node.data]
+                tac.append(f"{temp} = {a} {op} {b}")
+                return temp
+
+            elif node.data == "neg":
+                val = process(node.children[0])
+                temp = new_temp()
+                tac.append(f"{temp} = -{val}")
+                return temp
+
+            elif node.data == "pos":
+                return process(node.children[0])
+
+            elif node.data == "number":
+                return node.children[0]
+
+            elif node.data == "var":
+                return node.children[0]
+
+        return str(node)
+
+    process(node)
+    return tac
+
+# TAC for a whole program, one statement at a time
+def three_address_code(code):
+    global temp_counter
+    cleaned_code = remove_comments_and_blank_lines(code)
+    temp_counter = 0
+    tac_output = []
+
+    try:
+        tree = get_parser().parse(cleaned_code)
+
+        if tree.data == "start":
+            for child in tree.children:
+                if isinstance(child, Tree):
+                    inner = child.children[0] if child.data == "statement" else child
+                    tac = generate_three_address_code(inner)
+                    tac_output.extend(tac)
+        else:
+            tac = generate_three_address_code(tree)
+            tac_output.extend(tac)
+
+    except Exception as e:
+        tac_output.append(f"# ERROR during parse: {e}")
+
+    return tac_output
+
+# Get indentation
+def get_indentation(code):
+    lines = code.strip().split("\n")
+    if not lines:
+        return ""
+    last = lines[-1].strip()
+    if last.endswith(":") or last.endswith("{"):
+        return "    "
+    return ""
+
+# Speech to Code Mapping
+def map_speech_to_code(text, language="Python", user_code=""):
+    text = text.lower().strip()
+    indent = get_indentation(user_code)
+
+    # Normalize common phrases
+    replacements = {
+        "plus": "+",
+        "minus": "-",
+        "into": "*",
+        "multiplied by": "*",
+        "multiplies": "*",
+        "divided by": "/",
+        "greater than or equal to": ">=",
+        "less than or equal to": "<=",
+        "greater than": ">",
+        "less than": "<",
+        "equal to": "=",
+        "equals to": "=",
+        "equals": "=",
+        "check is equal to": "==",
+        "check is equals to": "==",
+        "is not equal to": "!=",
+        "not equal to": "!=",
+        "not equals": "!=",
+        "and": "and",
+        "or": "or",
+        "not": "not",
+        "open parenthesis": "(",
+        "close parenthesis": ")",
+        "mode": "%",
+        "floor division": "//",
+        "smaller than": "<",
+        "bigger than": ">",
+        "dot": "."
+    }
+
+    for phrase, symbol in replacements.items():
+        text = text.replace(phrase, f" {symbol} ")
+
+    text = ' '.join(text.split())  # remove extra whitespace
+
+    if language == "Python":
+        # Handle print
+        if text.startswith("print "):
+            return indent + f'print("{text.replace("print ", "")}")'
+
+        # Handle input
+        if "take input for" in text:
+            var = text.split("for")[-1].strip()
+            return indent + f'{var} = input("Enter {var}: ")'
+
+        # Handle function definition
+        if re.match(r"(create |define |make )?function (\w+)(?:\s+with\s+(.+))?", text):
+            match = re.match(r"(create |define |make )?function (\w+)(?:\s+with\s+(.+))?", text)
+            func_name = match.group(2)
+            params = match.group(3) if match.group(3) else ""
+            
+            # Process parameters if they exist
+            if params:
+                # Split by "and" or comma for multiple parameters
+                param_list = re.split(r",\s*|\s+and\s+", params)
+                params = ", ".join(param.strip() for param in param_list)
+            
+            return indent + f"def {func_name}({params}):"
+
+        # Handle function call
+        if text.startswith("call function"):
+            match = re.match(r"call function (\w+)(?: with (.+))?", text)
+            if match:
+                func = match.group(1)
+                args = match.group(2)
+                if args:
+                    args = ', '.join(arg.strip() for arg in args.split("and"))
+                else:
+                    args = ''
+                return indent + f"{func}({args})"
+
+        # Variable assignment with operator expressions
+        match = re.match(r"(?:create |set |define |variable )?([a-zA-Z_]\w*) (?:=|equals|is|:=|==)? (.+)", text)
+        if match:
+            var_name = match.group(1).strip()
+            value_expr = match.group(2).strip()
+            return indent + f"{var_name} = {value_expr}"
+
+        # Incomplete expression like "equals b + c"
+        if text.startswith("==") or text.startswith("= "):
+            value_expr = text.split("=", 1)[-1].strip()
+            return indent + f"# Missing variable name = {value_expr}"
+
+        # While loop - Enhanced to handle natural language expressions
+        if "while" in text:
+            # Try to extract a condition after "while"
+            match = re.search(r"while\s+(.+?)(?:\s+do)?$", text)
+            if match:
+                condition = match.group(1).strip()
+                
+                # Process natural language conditions
+                condition = process_condition(condition)
+                
+                return indent + f"while {condition}:"
+            else:
+                return indent + "while True:  # Condition not recognized"
+
+        # If condition
+        if text.startswith("if "):
+            condition = text.replace("if", "", 1).strip()
+            # Process natural language conditions
+            condition = process_condition(condition)
+            return indent + f"if {condition}:"
+
+        # Else
+        if text.strip() == "else":
+            return indent + "else:"
+
+        # For loop
+        match = re.search(r"for\s+(\w+)\s+(?:in\s+range\s+)?from (\d+) to (\d+)", text)
+        if match:
+            var_name, start, end = match.groups()
+            return indent + f"for {var_name} in range({start}, {int(end)+1}):"
+        
+        match = re.search(r"from (\d+) to (\d+)", text)
+        if match:
+            start, end = match.groups()
+            return indent + f"for i in range({start}, {int(end)+1}):"
+
+    return indent + f"# Unrecognized: {text}"
+
+# Helper function to process natural language conditions
+def process_condition(condition):
+    # Map natural language comparative expressions to code
+    condition = condition.strip()
+    
+    # Replace phrases with proper syntax
+    condition = re.sub(r"(\w+)\s+is\s+greater\s+than\s+(\w+|\d+)", r"\1 > \2", condition)
+    condition = re.sub(r"(\w+)\s+is\s+less\s+than\s+(\w+|\d+)", r"\1 < \2", condition)
+    condition = re.sub(r"(\w+)\s+is\s+equal\s+to\s+(\w+|\d+)", r"\1 == \2", condition)
+    condition = re.sub(r"(\w+)\s+equals\s+(\w+|\d+)", r"\1 == \2", condition)
+    condition = re.sub(r"(\w+)\s+is\s+not\s+equal\s+to\s+(\w+|\d+)", r"\1 != \2", condition)
+    condition = re.sub(r"(\w+)\s+is\s+greater\s+than\s+or\s+equal\s+to\s+(\w+|\d+)", r"\1 >= \2", condition)
+    condition = re.sub(r"(\w+)\s+is\s+less\s+than\s+or\s+equal\s+to\s+(\w+|\d+)", r"\1 <= \2", condition)
+    
+    return condition
+
+
+
+# Tree <-> JSON conversion (used to ship parse trees to and from the compile server)
+# Deeper trees can't be drawn usefully, and would overflow recursive JSON/pickle encoders
+MAX_TREE_DEPTH = 200
+
+def check_tree_depth(tree):
+    stack = [(tree, 1)]
+    while stack:
+        node, depth = stack.pop()
+        if depth > MAX_TREE_DEPTH:
+            raise ValueError(f"Expression is nested too deeply (more than {MAX_TREE_DEPTH} levels)")
+        if isinstance(node, Tree):
+            stack.extend((child, depth + 1) for child in node.children)
+    return tree
+
+def tree_to_dict(node):
+    if isinstance(node, Tree):
+        return {"data": str(node.data), "children": [tree_to_dict(child) for child in node.children]}
+    if isinstance(node, Token):
+        return {"type": node.type, "value": str(node)}
+    return {"type": "", "value": str(node)}
+
+def dict_to_tree(data):
+    if "data" in data:
+        return Tree(data["data"], [dict_to_tree(child) for child in data["children"]])
+    return Token(data["type"], data["value"])
+
+# Same walk as the annotated tree view: every subtree is annotated in pre-order
+# against one shared symbol table, and its value is stored next to it.
+def annotated_tree_to_dict(node, symbol_table=None):
+    if symbol_table is None:
+        symbol_table = {}
+
+    if not isinstance(node, Tree):
+        return tree_to_dict(node)
+
+    _, ann = annotate_tree(node, symbol_table)
+    return {
+        "data": str(node.data),
+        "value": ann.get("value"),
+        "children": [annotated_tree_to_dict(child, symbol_table) for child in node.children],
+    }
+
+
+# JSON-friendly entry points, shared by the local GUI and the compile server
+def tokenize(code):
+    return [list(token) for token in tokenize_code(code)]
+
+def parse(code):
+    return tree_to_dict(check_tree_depth(get_parser().parse(code)))
+
+def annotate(code):
+    tree = check_tree_depth(get_parser().parse(remove_comments_and_blank_lines(code)))
+    return annotated_tree_to_dict(tree)
+
+def map_speech(text, language="Python", user_code=""):
+    return map_speech_to_code(text, language, user_code)
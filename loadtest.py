@@ -0,0 +1,127 @@
+import argparse
+import asyncio
+import itertools
+import time
+
+import aiohttp
+
+from client import DEFAULT_SERVER
+
+SAMPLE_CODE = [
+    "a = 5\nb = 10\nc = a + b * 2",
+    "x = (3 + 4) * 5 - 6 / 2\ny = x % 7",
+    "total = -price * qty + tax\ntotal",
+    "n = 1 + 2 + 3 + 4 + 5 + 6 + 7 + 8\nm = n * n - n / 2",
+]
+SAMPLE_SPEECH = [
+    "create function add with a and b",
+    "set total equals a plus b",
+    "while x is less than 10",
+    "for i from 1 to 10",
+]
+OPS = ["tokenize", "parse", "annotate", "tac", "map"]
+
+
+# unique_every=N makes every Nth request unique so it misses the result cache
+def make_payload(op, i, unique_every):
+    unique = unique_every and i % unique_every == 0
+    if op == "map":
+        text = SAMPLE_SPEECH[i % len(SAMPLE_SPEECH)]
+        return {"text": f"{text} plus {i}" if unique else text}
+    code = SAMPLE_CODE[i % len(SAMPLE_CODE)]
+    return {"code": f"{code}\nz{i} = {i} * 2" if unique else code}
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = round(pct / 100 * (len(sorted_values) - 1))
+    return sorted_values[index]
+
+
+# Workers append (status, latency) per request; statuses are HTTP-style codes
+async def http_worker(session, url, jobs, results):
+    for op, payload in jobs:
+        start = time.perf_counter()
+        try:
+            async with session.post(f"{url}/{op}", json=payload) as response:
+                await response.read()
+                status = response.status
+        except aiohttp.ClientError:
+            status = "conn-error"
+        results.append((status, time.perf_counter() - start))
+
+async def ws_worker(session, url, jobs, results):
+    async with session.ws_connect(f"{url}/ws") as ws:
+        for request_id, (op, payload) in enumerate(jobs):
+            start = time.perf_counter()
+            await ws.send_json({"id": request_id, "op": op, **payload})
+            reply = await ws.receive_json()
+            results.append((reply.get("status"), time.perf_counter() - start))
+
+
+def print_latencies(name, latencies):
+    if not latencies:
+        print(f"{name:<15}: -")
+        return
+    latencies = sorted(latencies)
+    cells = [f"p{pct}={percentile(latencies, pct) * 1000:.2f}" for pct in (50, 90, 99, 99.9)]
+    print(f"{name:<15}: {' '.join(cells)} max={latencies[-1] * 1000:.2f} (ms)")
+
+
+async def run(args):
+    ops = OPS if args.op == "mix" else [args.op]
+    jobs = [
+        (op, make_payload(op, i, args.unique_every))
+        for i, op in zip(range(args.requests), itertools.cycle(ops))
+    ]
+    # One shared iterator: each worker keeps pulling until the job list is exhausted
+    job_iter = iter(jobs)
+    results = []
+    worker = ws_worker if args.ws else http_worker
+
+    connector = aiohttp.TCPConnector(limit=args.concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            worker(session, args.url, job_iter, results)
+            for _ in range(args.concurrency)
+        ))
+        elapsed = time.perf_counter() - start
+
+        async with session.get(f"{args.url}/stats") as response:
+            server_stats = await response.json()
+
+    statuses = {}
+    for status, _ in results:
+        statuses[status] = statuses.get(status, 0) + 1
+    # Rejections come back fast, so only successful requests count towards
+    # throughput and tail latency; 503s are reported on their own
+    ok = [latency for status, latency in results if status == 200]
+    rejected = [latency for status, latency in results if status == 503]
+
+    print(f"Transport      : {'websocket' if args.ws else 'http'}")
+    print(f"Endpoint(s)    : {', '.join(ops)}")
+    print(f"Requests       : {len(results)} in {elapsed:.2f}s (concurrency {args.concurrency})")
+    print("Status counts  : " + ", ".join(f"{k}={v}" for k, v in sorted(statuses.items(), key=str)))
+    print(f"Throughput     : {len(ok) / elapsed:.1f} req/s successful (200), "
+          f"{len(results) / elapsed:.1f} req/s offered")
+    print_latencies("Latency (200)", ok)
+    print(f"Rejected (503) : {len(rejected)} ({len(rejected) / len(results):.1%})" if results else "Rejected (503) : 0")
+    print_latencies("Latency (503)", rejected)
+    print(f"Server stats   : {server_stats}")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Load test for the VoxCoder compile server")
+    arg_parser.add_argument("--url", default=DEFAULT_SERVER)
+    arg_parser.add_argument("--op", choices=OPS + ["mix"], default="mix")
+    arg_parser.add_argument("--requests", type=int, default=5000)
+    arg_parser.add_argument("--concurrency", type=int, default=64)
+    arg_parser.add_argument("--unique-every", type=int, default=10,
+                            help="make every Nth request unique to bypass the cache (0 = never)")
+    arg_parser.add_argument("--ws", action="store_true", help="use the WebSocket endpoint instead of HTTP")
+    asyncio.run(run(arg_parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
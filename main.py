@@ -3,10 +3,12 @@ from tkinter import messagebox, scrolledtext, ttk
 import speech_recognition as sr
 import pyttsx3
 import threading
-import re
-from lark import Lark, Tree
+from lark import Tree
 import tempfile
 import os
+import compiler_core
+from compiler_core import dict_to_tree
+from client import CompileClient, CompileServerError
 
 # Initialization
 recognizer = sr.Recognizer()
@@ -14,99 +16,28 @@ tts_engine = pyttsx3.init()
 user_code = ""
 current_language = "Python"
 
-# Define a simple grammar for parse tree generation
-parser = Lark(r"""
-    start: statement+
-
-    statement: assignment
-             | expr
-
-    assignment: NAME "=" expr
-
-    ?expr: expr "+" term   -> add
-         | expr "-" term   -> sub
-         | term
-
-    ?term: term "*" factor -> mul
-         | term "/" factor -> div
-         | term "%" factor -> mod
-         | factor
-
-    ?factor: "-" factor    -> neg
-           | "+" factor    -> pos
-           | NUMBER        -> number
-           | NAME          -> var
-           | "(" expr ")"
-
-    %import common.CNAME -> NAME
-    %import common.NUMBER
-    %import common.NEWLINE
-    %import common.WS
-    %ignore WS
-    %ignore NEWLINE
-""", parser='lalr')
-
-
-import re
-
-def tokenize_code(code):
-    keywords = {
-        'if', 'else', 'elif', 'for', 'while', 'def', 'return', 'in',
-        'and', 'or', 'not', 'True', 'False', 'None', 'class', 'break',
-        'continue', 'pass', 'import', 'from', 'as', 'with', 'is', 'lambda'
-    }
-#Tokenization Function
-    token_specification = [
-        ('COMMENT',  r'#.*'),                            # Comments
-        ('STRING',   r'(\".*?\"|\'.*?\')'),              # Strings
-        ('NUMBER',   r'\d+(\.\d*)?'),                    # Integer or decimal numbers
-        ('ASSIGN',   r'='),                              # Assignment
-        ('OP',       r'[+\-*/%]'),                       # Operators
-        ('LIST',     r'[\[\]]'),                         # List brackets
-        ('DICT',     r'[\{\}]'),                         # Dictionary braces
-        ('COLON',    r':'),                              # Colon
-        ('COMMA',    r','),                              # Comma
-        ('PAREN',    r'[()]'),                           # Parentheses
-        ('ID',       r'[A-Za-z_]\w*'),                   # Identifiers or keywords
-        ('NEWLINE',  r'\n'),                             # Line breaks
-        ('SKIP',     r'[ \t]+'),                         # Whitespace
-        ('MISMATCH', r'.'),                              # Any other character
-    ]
-
-    tok_regex = '|'.join(f'(?P<{name}>{pattern})' for name, pattern in token_specification)
-    get_token = re.compile(tok_regex).match
-
-    tokens = []
-    pos = 0
-    mo = get_token(code, pos)
-    while mo is not None:
-        kind = mo.lastgroup
-        value = mo.group()
-
-        if kind in ['SKIP', 'NEWLINE', 'COMMENT']:
-            pass  # skip whitespace, newlines, comments
-        elif kind == 'ID':
-            if value in keywords:
-                kind = 'KEYWORD' if value not in {'True', 'False', 'None'} else \
-                       'BOOL' if value in {'True', 'False'} else 'NONE'
-            tokens.append((kind, value))
-        elif kind == 'MISMATCH':
-            tokens.append(('ERROR', value))
-        else:
-            tokens.append((kind, value))
+# Compiler backend: runs in-process by default, or against a shared compile server
+# (see server.py) when VOXCODER_SERVER is set, e.g. http://127.0.0.1:8765
+compile_server = os.environ.get("VOXCODER_SERVER")
+backend = CompileClient(compile_server) if compile_server else compiler_core
 
-        pos = mo.end()
-        mo = get_token(code, pos)
+# Backend calls may go over the network, so run them off the UI thread and hand
+# the result (or the error) back to Tk with app.after. One call at a time, since
+# the in-process TAC generator keeps a global temp counter.
+backend_lock = threading.Lock()
 
-    return tokens
+def run_backend(call, on_done, error_title):
+    def worker():
+        try:
+            with backend_lock:
+                result = call()
+        except Exception as e:
+            message = str(e)
+            app.after(0, lambda: messagebox.showerror(error_title, message))
+        else:
+            app.after(0, lambda: on_done(result))
 
-# Strip comments and blank lines before parsing
-def remove_comments_and_blank_lines(code):
-    return '\n'.join(
-        line.split('#')[0].strip()
-        for line in code.splitlines()
-        if line.strip() and not line.strip().startswith('#')
-    )
+    threading.Thread(target=worker, daemon=True).start()
 
 # Display Tokenization in a popup
 def show_tokens_window(tokens):
@@ -121,6 +52,23 @@ def show_tokens_window(tokens):
 
 # 1. Matplotlib Visualization Tree
 def show_matplotlib_tree(code):
+    lines = [line.strip() for line in code.strip().splitlines()]
+    lines = [line for line in lines if line and not line.startswith('#')]
+
+    def parse_lines():
+        results = []
+        for stripped in lines:
+            try:
+                results.append((stripped, backend.parse(stripped), None))
+            except CompileServerError:
+                raise  # server trouble: one error dialog, not one per line
+            except Exception as e:
+                results.append((stripped, None, e))
+        return results
+
+    run_backend(parse_lines, draw_matplotlib_trees, "Compile Server Error")
+
+def draw_matplotlib_trees(results):
     try:
         import matplotlib.pyplot as plt
         from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
@@ -160,14 +108,12 @@ def show_matplotlib_tree(code):
                     ax.plot([x, cx], [y, cy], 'k-', lw=1)
                     draw_tree(child, ax, positions)
 
-        # Split by lines and draw each tree
-        for line in code.strip().splitlines():
-            stripped = line.strip()
-            if not stripped or stripped.startswith('#'):
-                continue
-
+        # Draw each line's tree
+        for stripped, parsed, error in results:
             try:
-                tree = parser.parse(stripped)
+                if error is not None:
+                    raise error
+                tree = dict_to_tree(parsed)
                 fig, ax = plt.subplots(figsize=(8, 6))
                 positions, _ = layout(tree)
                 draw_tree(tree, ax, positions)
@@ -189,101 +135,62 @@ def show_matplotlib_tree(code):
 
 #2.   Annotated Parse tree 
 def show_annotated_matplotlib_tree(code):
+    # Annotation (semantic phase) runs in compiler_core or on the compile server
+    run_backend(lambda: backend.annotate(code), draw_annotated_matplotlib_tree, "Error")
+
+def draw_annotated_matplotlib_tree(annotated):
     try:
         import matplotlib.pyplot as plt
         from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 
-        tree = parser.parse(remove_comments_and_blank_lines(code))
-
         fig, ax = plt.subplots(figsize=(12, 8))
 
-        # Annotate Tree (Semantic Phase)
-        def annotate_tree(node, symbol_table=None):
-            if symbol_table is None:
-                symbol_table = {}
-
-            annotations = {}
-
-            if isinstance(node, Tree):
-                if node.data == "assignment":
-                    var_name = node.children[0].value
-                    value_node = node.children[1]
-                    value, _ = annotate_tree(value_node, symbol_table)
-                    symbol_table[var_name] = value
-                    annotations = {"value": f"{var_name} = {value}"}
-                    return None, annotations
-
-                elif node.data in ["add", "sub", "mul", "div", "mod"]:
-                    left_val, _ = annotate_tree(node.children[0], symbol_table)
-                    right_val, _ = annotate_tree(node.children[1], symbol_table)
-                    try:
-                        result = eval(f"{left_val} {'+' if node.data=='add' else '-' if node.data=='sub' else '*' if node.data=='mul' else '/' if node.data=='div' else '%'} {right_val}")
-                        return result, {"value": result}
-                    except:
-                        return None, {"value": "?"}
-
-                elif node.data == "number":
-                    return float(node.children[0]), {"value": float(node.children[0])}
-
-                elif node.data == "var":
-                    var_name = node.children[0].value
-                    val = symbol_table.get(var_name, "?")
-                    return val, {"value": val}
-
-                else:
-                    for child in node.children:
-                        annotate_tree(child, symbol_table)
-
-            return None, annotations
-
-        #Layout calculation
+        #Layout calculation (nodes are plain dicts, so they are keyed by id)
         def layout(node, depth=0, x_offset=0, positions=None, widths=None):
             if positions is None:
                 positions = {}
             if widths is None:
                 widths = {}
 
-            if isinstance(node, Tree):
-                widths[node] = 0
+            if "children" in node:
+                widths[id(node)] = 0
                 child_x = x_offset
-                for child in node.children:
+                for child in node["children"]:
                     layout(child, depth + 1, child_x, positions, widths)
-                    child_x += widths[child] + 1
-                    widths[node] += widths[child] + 1
-                widths[node] = max(1, widths[node] - 1)
-                mid_x = x_offset + widths[node] / 2
+                    child_x += widths[id(child)] + 1
+                    widths[id(node)] += widths[id(child)] + 1
+                widths[id(node)] = max(1, widths[id(node)] - 1)
+                mid_x = x_offset + widths[id(node)] / 2
             else:
-                widths[node] = 1
+                widths[id(node)] = 1
                 mid_x = x_offset + 0.5
 
-            positions[node] = (mid_x, -depth)
+            positions[id(node)] = (mid_x, -depth)
             return positions, widths
 
         # Drawing the annotated tree
-        def draw_tree(node, positions, symbol_table=None):
-            x, y = positions[node]
+        def draw_tree(node, positions):
+            x, y = positions[id(node)]
 
-            if isinstance(node, Tree):
-                label = node.data
-                _, ann = annotate_tree(node, symbol_table)
-                if ann.get("value") is not None:
-                    label += f"\n[{ann['value']}]"
+            if "children" in node:
+                label = node["data"]
+                if node.get("value") is not None:
+                    label += f"\n[{node['value']}]"
             else:
-                label = str(node)
+                label = node["value"]
 
             ax.text(x, y, label, ha="center", va="center", fontsize=10,
                     bbox=dict(facecolor='lightgreen', boxstyle='round,pad=0.4'))
 
-            if isinstance(node, Tree):
-                for child in node.children:
-                    cx, cy = positions[child]
+            if "children" in node:
+                for child in node["children"]:
+                    cx, cy = positions[id(child)]
                     ax.plot([x, cx], [y, cy], 'k-', lw=1)
-                    draw_tree(child, positions, symbol_table)
+                    draw_tree(child, positions)
 
         # --- Final render ---
-        symbol_table = {}
-        positions, _ = layout(tree)
-        draw_tree(tree, positions, symbol_table)
+        positions, _ = layout(annotated)
+        draw_tree(annotated, positions)
 
         ax.axis('off')
 
@@ -300,91 +207,13 @@ def show_annotated_matplotlib_tree(code):
         messagebox.showerror("Error", str(e))
 
 
-#3. Three Address Code Generation
-temp_counter = 0  # Ensure this is at the top-level of your file (outside any function)
-
-def generate_three_address_code(node, tac=None, symbol_table=None):
-    global temp_counter
-
-    if tac is None:
-        tac = []
-    if symbol_table is None:
-        symbol_table = {}
-
-    def new_temp():
-        global temp_counter  
-        temp = f"t{temp_counter}"
-        temp_counter += 1
-        return temp
-
-    def process(node):
-        if isinstance(node, Tree):
-            if node.data == "assignment":
-                var_name = node.children[0].value
-                expr = node.children[1]
-                result = process(expr)
-                tac.append(f"{var_name} = {result}")
-                symbol_table[var_name] = result
-                return var_name
-
-            elif node.data in ["add", "sub", "mul", "div", "mod"]:
-                a = process(node.children[0])
-                b = process(node.children[1])
-                temp = new_temp()
-                op = {
-                    "add": "+", "sub": "-", "mul": "*", "div": "/", "mod": "%"
-                }[node.data]
-                tac.append(f"{temp} = {a} {op} {b}")
-                return temp
-
-            elif node.data == "neg":
-                val = process(node.children[0])
-                temp = new_temp()
-                tac.append(f"{temp} = -{val}")
-                return temp
-
-            elif node.data == "pos":
-                return process(node.children[0])
-
-            elif node.data == "number":
-                return node.children[0]
-
-            elif node.data == "var":
-                return node.children[0]
-
-        return str(node)
-
-    process(node)
-    return tac
-
+#3. Three Address Code
 def show_three_address_code():
     global user_code
-    try:
-        import tkinter as tk
-        from tkinter import scrolledtext
-
-        cleaned_code = remove_comments_and_blank_lines(user_code)
-        global temp_counter
-        temp_counter = 0
-        tac_output = []
-
-        try:
-            tree = parser.parse(cleaned_code)
-            print("Parsed tree root:", tree.data)
-
-            if tree.data == "start":
-                for child in tree.children:
-                    if isinstance(child, Tree):
-                        inner = child.children[0] if child.data == "statement" else child
-                        tac = generate_three_address_code(inner)
-                        tac_output.extend(tac)
-            else:
-                tac = generate_three_address_code(tree)
-                tac_output.extend(tac)
-
-        except Exception as e:
-            tac_output.append(f"# ERROR during parse: {e}")
+    run_backend(lambda: backend.three_address_code(user_code), show_tac_window, "TAC Error")
 
+def show_tac_window(tac_output):
+    try:
         tac_win = tk.Toplevel()
         tac_win.title("Three Address Code")
         tac_win.geometry("600x400")
@@ -402,161 +231,6 @@ def show_three_address_code():
 
 
 
-
-# Get indentation
-def get_indentation(code):
-    lines = code.strip().split("\n")
-    if not lines:
-        return ""
-    last = lines[-1].strip()
-    if last.endswith(":") or last.endswith("{"):
-        return "    "
-    return ""
-
-# Speech to Code Mapping
-def map_speech_to_code(text, language="Python", user_code=""):
-    text = text.lower().strip()
-    indent = get_indentation(user_code)
-
-    # Normalize common phrases
-    replacements = {
-        "plus": "+",
-        "minus": "-",
-        "into": "*",
-        "multiplied by": "*",
-        "multiplies": "*",
-        "divided by": "/",
-        "greater than or equal to": ">=",
-        "less than or equal to": "<=",
-        "greater than": ">",
-        "less than": "<",
-        "equal to": "=",
-        "equals to": "=",
-        "equals": "=",
-        "check is equal to": "==",
-        "check is equals to": "==",
-        "is not equal to": "!=",
-        "not equal to": "!=",
-        "not equals": "!=",
-        "and": "and",
-        "or": "or",
-        "not": "not",
-        "open parenthesis": "(",
-        "close parenthesis": ")",
-        "mode": "%",
-        "floor division": "//",
-        "smaller than": "<",
-        "bigger than": ">",
-        "dot": "."
-    }
-
-    for phrase, symbol in replacements.items():
-        text = text.replace(phrase, f" {symbol} ")
-
-    text = ' '.join(text.split())  # remove extra whitespace
-
-    if language == "Python":
-        # Handle print
-        if text.startswith("print "):
-            return indent + f'print("{text.replace("print ", "")}")'
-
-        # Handle input
-        if "take input for" in text:
-            var = text.split("for")[-1].strip()
-            return indent + f'{var} = input("Enter {var}: ")'
-
-        # Handle function definition
-        if re.match(r"(create |define |make )?function (\w+)(?:\s+with\s+(.+))?", text):
-            match = re.match(r"(create |define |make )?function (\w+)(?:\s+with\s+(.+))?", text)
-            func_name = match.group(2)
-            params = match.group(3) if match.group(3) else ""
-            
-            # Process parameters if they exist
-            if params:
-                # Split by "and" or comma for multiple parameters
-                param_list = re.split(r",\s*|\s+and\s+", params)
-                params = ", ".join(param.strip() for param in param_list)
-            
-            return indent + f"def {func_name}({params}):"
-
-        # Handle function call
-        if text.startswith("call function"):
-            match = re.match(r"call function (\w+)(?: with (.+))?", text)
-            if match:
-                func = match.group(1)
-                args = match.group(2)
-                if args:
-                    args = ', '.join(arg.strip() for arg in args.split("and"))
-                else:
-                    args = ''
-                return indent + f"{func}({args})"
-
-        # Variable assignment with operator expressions
-        match = re.match(r"(?:create |set |define |variable )?([a-zA-Z_]\w*) (?:=|equals|is|:=|==)? (.+)", text)
-        if match:
-            var_name = match.group(1).strip()
-            value_expr = match.group(2).strip()
-            return indent + f"{var_name} = {value_expr}"
-
-        # Incomplete expression like "equals b + c"
-        if text.startswith("==") or text.startswith("= "):
-            value_expr = text.split("=", 1)[-1].strip()
-            return indent + f"# Missing variable name = {value_expr}"
-
-        # While loop - Enhanced to handle natural language expressions
-        if "while" in text:
-            # Try to extract a condition after "while"
-            match = re.search(r"while\s+(.+?)(?:\s+do)?$", text)
-            if match:
-                condition = match.group(1).strip()
-                
-                # Process natural language conditions
-                condition = process_condition(condition)
-                
-                return indent + f"while {condition}:"
-            else:
-                return indent + "while True:  # Condition not recognized"
-
-        # If condition
-        if text.startswith("if "):
-            condition = text.replace("if", "", 1).strip()
-            # Process natural language conditions
-            condition = process_condition(condition)
-            return indent + f"if {condition}:"
-
-        # Else
-        if text.strip() == "else":
-            return indent + "else:"
-
-        # For loop
-        match = re.search(r"for\s+(\w+)\s+(?:in\s+range\s+)?from (\d+) to (\d+)", text)
-        if match:
-            var_name, start, end = match.groups()
-            return indent + f"for {var_name} in range({start}, {int(end)+1}):"
-        
-        match = re.search(r"from (\d+) to (\d+)", text)
-        if match:
-            start, end = match.groups()
-            return indent + f"for i in range({start}, {int(end)+1}):"
-
-    return indent + f"# Unrecognized: {text}"
-
-# Helper function to process natural language conditions
-def process_condition(condition):
-    # Map natural language comparative expressions to code
-    condition = condition.strip()
-    
-    # Replace phrases with proper syntax
-    condition = re.sub(r"(\w+)\s+is\s+greater\s+than\s+(\w+|\d+)", r"\1 > \2", condition)
-    condition = re.sub(r"(\w+)\s+is\s+less\s+than\s+(\w+|\d+)", r"\1 < \2", condition)
-    condition = re.sub(r"(\w+)\s+is\s+equal\s+to\s+(\w+|\d+)", r"\1 == \2", condition)
-    condition = re.sub(r"(\w+)\s+equals\s+(\w+|\d+)", r"\1 == \2", condition)
-    condition = re.sub(r"(\w+)\s+is\s+not\s+equal\s+to\s+(\w+|\d+)", r"\1 != \2", condition)
-    condition = re.sub(r"(\w+)\s+is\s+greater\s+than\s+or\s+equal\s+to\s+(\w+|\d+)", r"\1 >= \2", condition)
-    condition = re.sub(r"(\w+)\s+is\s+less\s+than\s+or\s+equal\s+to\s+(\w+|\d+)", r"\1 <= \2", condition)
-    
-    return condition
-
 # Voice recognition
 def speak(text):
     tts_engine.say(text)
@@ -575,13 +249,16 @@ def recognize_speech_thread():
             text = recognizer.recognize_google(audio)
             status_label.configure(text=f"You said: {text}")
 
-            mapped_code = map_speech_to_code(text, current_language, user_code)
+            mapped_code = backend.map_speech(text, current_language, user_code)
             code_box.insert("end", mapped_code + "\n")  
             user_code += mapped_code + "\n"
     except sr.UnknownValueError:
         messagebox.showerror("Speech Error", "Could not understand audio")
     except sr.RequestError:
         messagebox.showerror("Connection Error", "Check your internet connection")
+    except CompileServerError as e:
+        status_label.configure(text="⚠️ Compile server error, nothing was added")
+        messagebox.showerror("Compile Server Error", str(e))
 
 def recognize_speech():
     threading.Thread(target=recognize_speech_thread).start()
@@ -600,8 +277,7 @@ def clear_code():
 
 def on_tokenize():
     global user_code
-    tokens = tokenize_code(user_code)
-    show_tokens_window(tokens)
+    run_backend(lambda: backend.tokenize(user_code), show_tokens_window, "Tokenize Error")
 
 def sync_user_code():
     global user_code
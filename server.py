@@ -0,0 +1,357 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import multiprocessing
+import os
+import pickle
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from aiohttp import web, WSMsgType
+
+import compiler_core
+
+# Endpoint name -> (compiler_core entry point, request fields passed as arguments)
+OPS = {
+    "tokenize": (compiler_core.tokenize, ("code",)),
+    "parse": (compiler_core.parse, ("code",)),
+    "annotate": (compiler_core.annotate, ("code",)),
+    "tac": (compiler_core.three_address_code, ("code",)),
+    "map": (compiler_core.map_speech, ("text", "language", "user_code")),
+}
+FIELD_DEFAULTS = {"language": "Python", "user_code": ""}
+MAX_FIELD_LENGTH = 64 * 1024  # characters per request field
+
+
+class CompileError(Exception):
+    pass
+
+
+class Overloaded(Exception):
+    pass
+
+
+class WorkerCrashed(Exception):
+    pass
+
+
+# Runs inside the pool workers
+def warm_worker():
+    compiler_core.get_parser()
+
+# Each result is pickled on its own, so one that can't be sent back fails only its
+# own job instead of the whole batch
+def run_batch(jobs):
+    results = []
+    for op, args in jobs:
+        func, _ = OPS[op]
+        try:
+            results.append((True, pickle.dumps(func(*args))))
+        except Exception as e:
+            results.append((False, str(e) or type(e).__name__))
+    return results
+
+
+# Keys are fixed-size digests of (op, args), so request sources are never kept
+def cache_key(op, args):
+    return hashlib.sha256(json.dumps([op, *args]).encode("utf-8")).digest()
+
+
+# LRU cache bounded by entry count and by the total (pickled) size of its values
+class ResultCache:
+    def __init__(self, maxsize, max_bytes=64 * 1024 * 1024):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return True, self.entries[key][0]
+        self.misses += 1
+        return False, None
+
+    def put(self, key, value, size):
+        if self.maxsize <= 0 or size > self.max_bytes:
+            return
+        if key in self.entries:
+            self.nbytes -= self.entries.pop(key)[1]
+        self.entries[key] = (value, size)
+        self.nbytes += size
+        while len(self.entries) > self.maxsize or self.nbytes > self.max_bytes:
+            _, (_, evicted_size) = self.entries.popitem(last=False)
+            self.nbytes -= evicted_size
+
+
+# Batches requests onto a process pool. Identical requests share one cache entry and,
+# while still running, one in-flight future. Once max_pending requests are queued or
+# running, new ones are rejected instead of piling up.
+class CompileService:
+    def __init__(self, workers, max_batch=32, batch_delay=0.002, max_pending=1024,
+                 cache_size=4096, cache_bytes=64 * 1024 * 1024):
+        self.workers = workers
+        self.max_batch = max_batch
+        self.batch_delay = batch_delay
+        self.max_pending = max_pending
+        self.cache = ResultCache(cache_size, cache_bytes)
+        self.inflight = {}
+        self.pending = 0
+        self.running = 0
+        self.peak_running = 0
+        self.batches = 0
+        self.batched_jobs = 0
+        self.rejected = 0
+        self.pool = None
+        self.pool_restarts = 0
+        self.queue = asyncio.Queue()
+        self.slots = asyncio.Semaphore(workers)
+        self.dispatcher = None
+        self.tasks = set()
+
+    def _new_pool(self):
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=warm_worker,
+        )
+
+    async def start(self):
+        self.pool = self._new_pool()
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self.pool, warm_worker) for _ in range(self.workers)))
+        self.dispatcher = asyncio.create_task(self._dispatch())
+
+    async def close(self):
+        if self.dispatcher is not None:
+            self.dispatcher.cancel()
+        for task in self.tasks:
+            task.cancel()
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+
+    async def submit(self, op, args):
+        key = cache_key(op, args)
+        hit, value = self.cache.get(key)
+        if hit:
+            return value
+
+        future = self.inflight.get(key)
+        if future is None:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise Overloaded("Compile server is busy, retry shortly")
+            future = asyncio.get_running_loop().create_future()
+            # Mark errors as retrieved even if every waiting client disconnected
+            future.add_done_callback(lambda f: f.cancelled() or f.exception())
+            self.inflight[key] = future
+            self.pending += 1
+            self.queue.put_nowait((key, (op, args), future))
+
+        # A client going away must not cancel a result other clients are waiting for
+        return await asyncio.shield(future)
+
+    async def _dispatch(self):
+        while True:
+            # Only pull work when a worker is free, so the queue grows under load
+            # and the next batch gets bigger
+            await self.slots.acquire()
+            batch = [await self.queue.get()]
+            # Wait briefly for company only when this job is alone and every other
+            # worker is busy; queued work or an idle worker means start right away
+            if self.batch_delay and self.running == self.workers - 1 and self.queue.empty():
+                await asyncio.sleep(self.batch_delay)
+            # Split what is queued evenly over the free workers (this one included)
+            free_workers = self.workers - self.running
+            size = min(self.max_batch, math.ceil((1 + self.queue.qsize()) / free_workers))
+            while len(batch) < size and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+
+            self.running += 1
+            self.peak_running = max(self.peak_running, self.running)
+            task = asyncio.create_task(self._run(batch))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+
+    async def _run(self, batch):
+        loop = asyncio.get_running_loop()
+        pool = self.pool
+        self.batches += 1
+        self.batched_jobs += len(batch)
+        try:
+            results = await loop.run_in_executor(pool, run_batch, [job for _, job, _ in batch])
+        except BrokenProcessPool:
+            # A worker died; every batch on that pool fails, but only the first rebuilds it
+            if self.pool is pool:
+                pool.shutdown(wait=False, cancel_futures=True)
+                self.pool = self._new_pool()
+                self.pool_restarts += 1
+            for _, _, future in batch:
+                future.set_exception(WorkerCrashed("A compile worker crashed, retry shortly"))
+        except Exception as e:
+            for _, _, future in batch:
+                future.set_exception(e)
+        else:
+            for (key, _, future), (ok, value) in zip(batch, results):
+                if ok:
+                    result = pickle.loads(value)
+                    self.cache.put(key, result, len(value))
+                    future.set_result(result)
+                else:
+                    future.set_exception(CompileError(value))
+        finally:
+            for key, _, _ in batch:
+                self.inflight.pop(key, None)
+            self.pending -= len(batch)
+            self.running -= 1
+            self.slots.release()
+
+    def stats(self):
+        return {
+            "workers": self.workers,
+            "pending": self.pending,
+            "running_batches": self.running,
+            "peak_running_batches": self.peak_running,
+            "pool_restarts": self.pool_restarts,
+            "rejected": self.rejected,
+            "batches": self.batches,
+            "avg_batch_size": round(self.batched_jobs / self.batches, 2) if self.batches else 0,
+            "cache_entries": len(self.cache.entries),
+            "cache_bytes": self.cache.nbytes,
+            "cache_hits": self.cache.hits,
+            "cache_misses": self.cache.misses,
+        }
+
+
+def build_args(op, payload):
+    if not isinstance(payload, dict):
+        raise ValueError("Request body must be a JSON object")
+    _, fields = OPS[op]
+    args = []
+    for field in fields:
+        value = payload.get(field, FIELD_DEFAULTS.get(field))
+        if not isinstance(value, str):
+            raise ValueError(f"'{field}' must be a string")
+        if len(value) > MAX_FIELD_LENGTH:
+            raise ValueError(f"'{field}' is too long (limit {MAX_FIELD_LENGTH} characters)")
+        args.append(value)
+    return tuple(args)
+
+# Always returns a (status, JSON body) pair, so every request gets an answer
+async def execute(service, op, payload):
+    if not isinstance(op, str):
+        return 400, {"error": "'op' must be a string"}
+    if op not in OPS:
+        return 404, {"error": f"Unknown endpoint: {op}"}
+    try:
+        result = await service.submit(op, build_args(op, payload))
+    except (ValueError, CompileError) as e:
+        return 400, {"error": str(e)}
+    except (Overloaded, WorkerCrashed) as e:
+        return 503, {"error": str(e)}
+    except Exception as e:
+        return 500, {"error": f"Internal server error: {e}"}
+    return 200, {"result": result}
+
+
+# === HTTP / WebSocket handlers ===
+async def handle_op(request):
+    try:
+        payload = await request.json()
+    except ValueError:
+        payload = None
+    status, body = await execute(request.app["service"], request.match_info["op"], payload)
+    headers = {"Retry-After": "1"} if status == 503 else None
+    return web.json_response(body, status=status, headers=headers)
+
+async def handle_stats(request):
+    return web.json_response(request.app["service"].stats())
+
+# Each message is {"id": ..., "op": "tac", "code": ...}; replies carry the same id
+# and may arrive out of order, so clients can pipeline requests on one socket.
+async def handle_ws(request):
+    ws = web.WebSocketResponse()
+    await ws.prepare(request)
+    service = request.app["service"]
+    tasks = set()
+
+    async def reply(message):
+        status, body = await execute(service, message.get("op"), message)
+        body.update(id=message.get("id"), status=status)
+        if not ws.closed:
+            try:
+                await ws.send_json(body)
+            except ConnectionResetError:
+                pass
+
+    async for msg in ws:
+        if msg.type == WSMsgType.BINARY:
+            await ws.send_json({"id": None, "status": 400, "error": "Only text (JSON) messages are supported"})
+            continue
+        if msg.type != WSMsgType.TEXT:
+            continue
+        try:
+            message = json.loads(msg.data)
+        except ValueError:
+            message = None
+        if not isinstance(message, dict):
+            await ws.send_json({"id": None, "status": 400, "error": "Message must be a JSON object"})
+            continue
+        task = asyncio.create_task(reply(message))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    for task in tasks:
+        task.cancel()
+    return ws
+
+
+def create_app(service):
+    app = web.Application()
+    app["service"] = service
+
+    async def on_startup(app):
+        await service.start()
+
+    async def on_cleanup(app):
+        await service.close()
+
+    app.on_startup.append(on_startup)
+    app.on_cleanup.append(on_cleanup)
+    app.router.add_get("/ws", handle_ws)
+    app.router.add_get("/stats", handle_stats)
+    app.router.add_post("/{op}", handle_op)
+    return app
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="VoxCoder local compile server")
+    arg_parser.add_argument("--host", default="127.0.0.1")
+    arg_parser.add_argument("--port", type=int, default=8765)
+    arg_parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    arg_parser.add_argument("--max-batch", type=int, default=32)
+    arg_parser.add_argument("--batch-delay-ms", type=float, default=2.0)
+    arg_parser.add_argument("--max-pending", type=int, default=1024)
+    arg_parser.add_argument("--cache-size", type=int, default=4096)
+    arg_parser.add_argument("--cache-mb", type=float, default=64)
+    args = arg_parser.parse_args()
+
+    service = CompileService(
+        workers=args.workers,
+        max_batch=args.max_batch,
+        batch_delay=args.batch_delay_ms / 1000,
+        max_pending=args.max_pending,
+        cache_size=args.cache_size,
+        cache_bytes=int(args.cache_mb * 1024 * 1024),
+    )
+    web.run_app(create_app(service), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
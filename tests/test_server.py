@@ -0,0 +1,200 @@
+import asyncio
+
+import pytest
+from lark import Tree
+
+import compiler_core
+import server
+from server import CompileError, CompileService, Overloaded, ResultCache, WorkerCrashed, execute, run_batch
+
+
+# Runs test(service) against a started service (one worker unless given)
+def with_service(test, workers=1, **options):
+    async def main():
+        service = CompileService(workers=workers, **options)
+        await service.start()
+        try:
+            return await test(service)
+        finally:
+            await service.close()
+
+    return asyncio.run(main())
+
+
+def test_result_cache_evicts_least_recently_used():
+    cache = ResultCache(maxsize=2)
+    cache.put("a", 1, 10)
+    cache.put("b", 2, 10)
+    assert cache.get("a") == (True, 1)
+    cache.put("c", 3, 10)
+    assert cache.get("b") == (False, None)
+    assert cache.get("a") == (True, 1)
+    assert cache.get("c") == (True, 3)
+
+
+def test_result_cache_is_bounded_by_bytes():
+    cache = ResultCache(maxsize=100, max_bytes=25)
+    cache.put("a", 1, 10)
+    cache.put("b", 2, 10)
+    cache.put("c", 3, 10)
+    assert cache.get("a") == (False, None)
+    assert cache.nbytes == 20
+    # A value larger than the whole cache is never stored
+    cache.put("huge", 4, 26)
+    assert cache.get("huge") == (False, None)
+    assert cache.nbytes == 20
+
+
+def test_stats_and_close_before_start():
+    service = CompileService(workers=2)
+    assert service.stats()["pool_restarts"] == 0
+    asyncio.run(service.close())
+
+
+def test_identical_requests_share_one_job():
+    async def test(service):
+        results = await asyncio.gather(*(service.submit("tac", ("a = 1 + 2",)) for _ in range(10)))
+        assert all(result == ["t0 = 1 + 2", "a = t0"] for result in results)
+        assert service.batched_jobs == 1
+        # Later requests are answered from the cache
+        assert await service.submit("tac", ("a = 1 + 2",)) == results[0]
+        assert service.batched_jobs == 1
+
+    with_service(test)
+
+
+def test_requests_are_batched():
+    async def test(service):
+        codes = [(f"x = {i} * 2",) for i in range(20)]
+        await asyncio.gather(*(service.submit("tac", code) for code in codes))
+        assert service.batched_jobs == 20
+        assert service.batches <= 2
+
+    with_service(test, batch_delay=0.05)
+
+
+def test_jobs_spread_across_workers():
+    async def test(service):
+        codes = [(f"x{i} = {i} * (2 + {i}) - {i} / 3",) for i in range(8)]
+        await asyncio.gather(*(service.submit("annotate", code) for code in codes))
+        assert service.batched_jobs == 8
+        assert service.batches >= 2
+        assert service.peak_running == 2
+
+    with_service(test, workers=2, batch_delay=0.05)
+
+
+def test_failing_result_only_fails_its_own_job():
+    deep = "a = " + "+".join(["1"] * 300)
+
+    async def test(service):
+        results = await asyncio.gather(
+            service.submit("parse", (deep,)),
+            *(service.submit("tac", (f"b = {i} + 1",)) for i in range(6)),
+            return_exceptions=True,
+        )
+        assert isinstance(results[0], CompileError)
+        assert results[1:] == [[f"t0 = {i} + 1", "b = t0"] for i in range(6)]
+        assert service.batches == 1
+        assert service.pending == 0
+
+    with_service(test, batch_delay=0.05)
+
+
+def test_run_batch_pickles_each_result_separately(monkeypatch):
+    # A lambda can't be pickled, so only this job should fail
+    monkeypatch.setitem(server.OPS, "unpicklable", (lambda code: lambda: code, ("code",)))
+    results = run_batch([("unpicklable", ("a",)), ("tokenize", ("a",))])
+    assert results[0][0] is False
+    assert results[1][0] is True
+
+
+def test_rejects_when_too_many_pending():
+    async def test(service):
+        results = await asyncio.gather(
+            *(service.submit("tokenize", (f"x = {i}",)) for i in range(5)),
+            return_exceptions=True,
+        )
+        assert sum(isinstance(result, Overloaded) for result in results) == 3
+        assert service.rejected == 3
+        assert service.pending == 0
+
+    with_service(test, max_pending=2)
+
+
+def test_pending_released_on_compile_error():
+    async def test(service):
+        with pytest.raises(CompileError):
+            await service.submit("parse", ("a = = 1",))
+        assert service.pending == 0
+        assert service.inflight == {}
+        assert service.cache.entries == {}
+        assert await service.submit("tokenize", ("a",)) == [["ID", "a"]]
+
+    with_service(test)
+
+
+def test_pool_rebuilt_after_worker_crash():
+    async def test(service):
+        # ProcessPoolExecutor has no public way to reach its worker processes, and
+        # killing one is the only faithful way to break the pool
+        for process in list(service.pool._processes.values()):
+            process.kill()
+            process.join()
+        with pytest.raises(WorkerCrashed):
+            await service.submit("tac", ("a = 1",))
+        assert service.pending == 0
+        assert service.pool_restarts == 1
+        assert await service.submit("tac", ("a = 1",)) == ["a = 1"]
+
+    with_service(test)
+
+
+def test_execute_always_replies():
+    class FailingService:
+        async def submit(self, op, args):
+            raise RuntimeError("boom")
+
+    async def test():
+        service = FailingService()
+        assert (await execute(service, ["x"], {"code": "a"}))[0] == 400
+        assert (await execute(service, "nope", {"code": "a"}))[0] == 404
+        assert (await execute(service, "tac", {"code": 5}))[0] == 400
+        assert (await execute(service, "tac", None))[0] == 400
+        assert (await execute(service, "tac", {"code": "a" * (server.MAX_FIELD_LENGTH + 1)}))[0] == 400
+        status, body = await execute(service, "tac", {"code": "a"})
+        assert status == 500 and "boom" in body["error"]
+
+    asyncio.run(test())
+
+
+# The annotated tree view used to annotate every subtree while drawing it, in pre-order,
+# against one shared symbol table; annotate() must produce the same values.
+def old_annotation_values(node, symbol_table, values):
+    if isinstance(node, Tree):
+        _, ann = compiler_core.annotate_tree(node, symbol_table)
+        values.append(ann.get("value"))
+        for child in node.children:
+            old_annotation_values(child, symbol_table, values)
+    return values
+
+def annotated_values(node, values):
+    if "children" in node:
+        values.append(node["value"])
+        for child in node["children"]:
+            annotated_values(child, values)
+    return values
+
+@pytest.mark.parametrize("code", [
+    "a = 5\nb = a * (2 + 3)\nc = b / 0",
+    "# reassign\nx = 2\ny = x * 3\nx = y + 1\nz = x - y % 4\nz",
+])
+def test_annotate_matches_old_per_node_order(code):
+    tree = compiler_core.get_parser().parse(compiler_core.remove_comments_and_blank_lines(code))
+    expected = old_annotation_values(tree, {}, [])
+    assert annotated_values(compiler_core.annotate(code), []) == expected
+
+
+def test_parse_round_trips_through_dict():
+    tree = compiler_core.get_parser().parse("a = -(1 + 2) * b")
+    assert compiler_core.dict_to_tree(compiler_core.parse("a = -(1 + 2) * b")) == tree